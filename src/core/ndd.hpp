@@ -1,5 +1,4 @@
 #pragma once
-#include <curl/curl.h>
 #include <regex>
 
 #include "hnsw/hnswlib.h"
@@ -11,12 +10,14 @@
 #include "index_meta.hpp"
 #include "msgpack_ndd.hpp"
 #include "quant_vector.hpp"
+#include "query_cache.hpp"
 #include "wal.hpp"
 #include "../quant/dispatch.hpp"
 #include "../utils/archive_utils.hpp"
 #include <memory>
 #include <deque>
 #include <unordered_map>
+#include <unordered_set>
 #include <list>
 #include <algorithm>
 #include <mutex>
@@ -28,6 +29,7 @@
 #include <random>
 #include <type_traits>
 #include <future>
+#include <span>
 
 #define MAX_BACKUP_NAME_LENGTH 200
 
@@ -156,6 +158,8 @@ private:
     std::atomic<bool> running_{true};
     // Write-ahead log for each index
     std::unordered_map<std::string, std::unique_ptr<WriteAheadLog>> wal_logs_;
+    // Cached search results. Must be invalidated whenever an index is modified
+    QueryCache query_cache_;
 
     // New methods to handle WAL
     WriteAheadLog* getOrCreateWAL(const std::string& index_id) {
@@ -1074,8 +1078,57 @@ public:
         entry.alg = std::move(new_alg);
     }
 
+    // Large batches are inserted in chunks of INSERT_CHUNK_SIZE. This bounds the memory used for
+    // the quantized copies of a batch and lets the WAL based autosave run between chunks.
+    // Takes ownership of the batch so vector data is moved rather than copied while quantizing.
+    // Every vector of the batch is validated here before the first chunk is written, so invalid
+    // input is rejected with a std::runtime_error and nothing of the batch is applied. Chunks are
+    // not atomic as a group though: if a chunk fails after earlier chunks were stored, a
+    // std::runtime_error reports how many vectors were applied. Those vectors stay stored and
+    // searchable
     template <typename VectorType>
-    bool addVectors(const std::string& index_id, const std::vector<VectorType>& vectors) {
+    bool addVectors(const std::string& index_id, std::vector<VectorType>&& vectors) {
+        const size_t dimension = getIndexEntry(index_id).alg->getDimension();
+        for(const auto& vec : vectors) {
+            if(vec.vector.size() != dimension) {
+                throw std::runtime_error("Vector dimension " + std::to_string(vec.vector.size())
+                                         + " does not match index dimension "
+                                         + std::to_string(dimension) + " for id: " + vec.id);
+            }
+            if constexpr(std::is_same_v<VectorType, ndd::HybridVectorObject>) {
+                if(vec.sparse_ids.size() != vec.sparse_values.size()) {
+                    throw std::runtime_error(
+                            "Mismatch between sparse_indices and sparse_values size for id: "
+                            + vec.id);
+                }
+            }
+        }
+
+        const size_t chunk_size = settings::INSERT_CHUNK_SIZE;
+        if(vectors.size() <= chunk_size) {
+            return addVectorsChunk<VectorType>(index_id, vectors);
+        }
+
+        LOG_DEBUG("Adding " << vectors.size() << " vectors to index " << index_id
+                            << " in chunks of " << chunk_size);
+        std::span<VectorType> all_vectors(vectors);
+        for(size_t start = 0; start < all_vectors.size(); start += chunk_size) {
+            size_t count = std::min(chunk_size, all_vectors.size() - start);
+            if(!addVectorsChunk(index_id, all_vectors.subspan(start, count))) {
+                if(start == 0) {
+                    return false;
+                }
+                throw std::runtime_error("Batch insertion failed after " + std::to_string(start)
+                                         + " of " + std::to_string(all_vectors.size())
+                                         + " vectors were applied");
+            }
+        }
+        return true;
+    }
+
+    // The vector data is moved out of the elements of the span
+    template <typename VectorType>
+    bool addVectorsChunk(const std::string& index_id, std::span<VectorType> vectors) {
         try {
             // Get the index entry (loads if needed, handles all locking)
             auto& entry = getIndexEntry(index_id);
@@ -1120,25 +1173,9 @@ public:
                     for(size_t i = 0; i < vectors.size(); ++i) {
                         const auto& vec = vectors[i];
                         if(!vec.sparse_ids.empty()) {
-                            // Sort indices and values together
-                            std::vector<std::pair<uint32_t, float>> pairs;
-                            pairs.reserve(vec.sparse_ids.size());
-                            for(size_t k = 0; k < vec.sparse_ids.size(); ++k) {
-                                pairs.emplace_back(vec.sparse_ids[k], vec.sparse_values[k]);
-                            }
-                            std::sort(pairs.begin(), pairs.end(), [](const auto& a, const auto& b) {
-                                return a.first < b.first;
-                            });
-
-                            ndd::SparseVector sparse_vec;
-                            sparse_vec.indices.reserve(pairs.size());
-                            sparse_vec.values.reserve(pairs.size());
-                            for(const auto& p : pairs) {
-                                sparse_vec.indices.push_back(p.first);
-                                sparse_vec.values.push_back(p.second);
-                            }
-
-                            sparse_batch.emplace_back(numeric_ids[i].first, std::move(sparse_vec));
+                            sparse_batch.emplace_back(numeric_ids[i].first,
+                                                      ndd::SparseVector::fromArrays(
+                                                              vec.sparse_ids, vec.sparse_values));
                         }
                     }
 
@@ -1158,10 +1195,7 @@ public:
             LOG_DEBUG("Converting " << vectors.size() << " vectors to QuantVectorObject with level "
                                     << (int)quant_level);
 
-            // Create a mutable copy for move operations
-            std::vector<VectorType> mutable_vectors = vectors;
-
-            for(auto& vec_obj : mutable_vectors) {
+            for(auto& vec_obj : vectors) {
                 // Use efficient move constructor with internal quantization
                 quantized_vectors.emplace_back(std::move(vec_obj), quant_level, dist_params);
             }
@@ -1225,6 +1259,7 @@ public:
             }
 
             entry.markUpdated();
+            query_cache_.invalidate(index_id);
 
             // Check if we need to save based on WAL entry count after logging
             if(wal->getEntryCount() >= persistence_config_.save_every_n_updates) {
@@ -1237,6 +1272,8 @@ public:
             return true;
         } catch(const std::exception& e) {
             std::cerr << "Batch insertion failed: " << e.what() << std::endl;
+            // The batch may have been partially applied
+            query_cache_.invalidate(index_id);
             return false;
         }
     }
@@ -1365,7 +1402,7 @@ public:
                             .dequantize(vec_bytes.data(), entry.alg->getDimension());
 
             // Add the float data to the msgpack
-            obj.vector = {float_data.begin(), float_data.end()};
+            obj.vector = std::move(float_data);
 
             return obj;
         } catch(const std::exception& e) {
@@ -1397,10 +1434,12 @@ public:
 
             // Mark the index as updated
             entry.markUpdated();
+            query_cache_.invalidate(entry.index_id);
 
             return true;
         } catch(const std::exception& e) {
             std::cerr << "Failed to delete vectors: " << e.what() << std::endl;
+            query_cache_.invalidate(entry.index_id);
             return false;
         }
     }
@@ -1434,6 +1473,51 @@ public:
         }
     }
 
+    // Delete a batch of vectors by string ID under a single lock and WAL entry. Unknown IDs are
+    // skipped. Returns the number of deleted vectors
+    size_t deleteVectors(const std::string& index_id, const std::vector<std::string>& str_ids) {
+        try {
+            auto& entry = getIndexEntry(index_id);
+
+            // Use per-index operation mutex to prevent concurrent operations
+            std::lock_guard<std::mutex> operation_lock(entry.operation_mutex);
+
+            std::vector<ndd::idInt> numeric_ids;
+            numeric_ids.reserve(str_ids.size());
+            std::unordered_set<ndd::idInt> seen;
+            for(const auto& str_id : str_ids) {
+                ndd::idInt numeric_id = entry.id_mapper->get_id(str_id);
+                if(numeric_id == 0) {
+                    LOG_DEBUG("deleteVectors: ID not found: " << str_id);
+                    continue;
+                }
+                // Duplicate IDs in the request must only be deleted once
+                if(seen.insert(numeric_id).second) {
+                    numeric_ids.push_back(numeric_id);
+                }
+            }
+            if(numeric_ids.empty()) {
+                return 0;
+            }
+
+            if(deleteVectorsByIds(entry, numeric_ids)) {
+                // Check if we need to save based on WAL entry count after logging
+                WriteAheadLog* wal = getOrCreateWAL(index_id);
+                if(wal->getEntryCount() >= persistence_config_.save_every_n_updates) {
+                    LOG_DEBUG("Saving index " << index_id << " after " << wal->getEntryCount()
+                                              << " updates");
+                    saveIndexInternal(entry);
+                }
+                return numeric_ids.size();
+            } else {
+                return 0;
+            }
+        } catch(const std::exception& e) {
+            std::cerr << "Failed to delete vectors: " << e.what() << std::endl;
+            return 0;
+        }
+    }
+
     // Update filters for a batch of vectors
     size_t updateFilters(const std::string& index_id,
                          const std::vector<std::pair<std::string, std::string>>& updates) {
@@ -1455,6 +1539,7 @@ public:
 
             if(updated_count > 0) {
                 entry.markUpdated();
+                query_cache_.invalidate(index_id);
             }
 
             return updated_count;
@@ -1497,24 +1582,80 @@ public:
         }
     }
 
-    std::optional<std::vector<ndd::VectorResult>> searchKNN(const std::string& index_id,
-                                                            const std::vector<float>& query,
-                                                            size_t k,
-                                                            const nlohmann::json& filter_array,
-                                                            bool include_vectors = false,
-                                                            size_t ef = 0) {
+    QueryCache::ResultsPtr searchKNN(const std::string& index_id,
+                                     const std::vector<float>& query,
+                                     size_t k,
+                                     const nlohmann::json& filter_array,
+                                     bool include_vectors = false,
+                                     size_t ef = 0) {
         return searchKNN(index_id, query, {}, {}, k, filter_array, include_vectors, ef);
     }
 
+    // Serves repeated queries from the query cache and runs the search on a miss. Returns nullptr
+    // if the index was not found or the search failed. The results may be shared with the cache
+    QueryCache::ResultsPtr searchKNN(const std::string& index_id,
+                                     const std::vector<float>& query,
+                                     const std::vector<uint32_t>& sparse_indices,
+                                     const std::vector<float>& sparse_values,
+                                     size_t k,
+                                     const nlohmann::json& filter_array,
+                                     bool include_vectors = false,
+                                     size_t ef = 0) {
+        if(!query_cache_.enabled()) {
+            auto results = searchKNNInternal(index_id,
+                                             query,
+                                             sparse_indices,
+                                             sparse_values,
+                                             k,
+                                             filter_array,
+                                             include_vectors,
+                                             ef);
+            if(!results) {
+                return nullptr;
+            }
+            return std::make_shared<const QueryCache::Results>(std::move(*results));
+        }
+
+        // The key embeds the index generation, so it must be built before searching
+        std::string cache_key = query_cache_.makeKey(index_id,
+                                                     query,
+                                                     sparse_indices,
+                                                     sparse_values,
+                                                     k,
+                                                     filter_array,
+                                                     include_vectors,
+                                                     ef);
+        if(auto cached = query_cache_.get(cache_key)) {
+            return cached;
+        }
+
+        auto results = searchKNNInternal(index_id,
+                                         query,
+                                         sparse_indices,
+                                         sparse_values,
+                                         k,
+                                         filter_array,
+                                         include_vectors,
+                                         ef);
+        if(!results) {
+            return nullptr;
+        }
+        auto shared_results = std::make_shared<const QueryCache::Results>(std::move(*results));
+        query_cache_.put(cache_key, shared_results);
+        return shared_results;
+    }
+
+    QueryCache::Stats getQueryCacheStats() const { return query_cache_.getStats(); }
+
     std::optional<std::vector<ndd::VectorResult>>
-    searchKNN(const std::string& index_id,
-              const std::vector<float>& query,
-              const std::vector<uint32_t>& sparse_indices,
-              const std::vector<float>& sparse_values,
-              size_t k,
-              const nlohmann::json& filter_array,
-              bool include_vectors = false,
-              size_t ef = 0) {
+    searchKNNInternal(const std::string& index_id,
+                      const std::vector<float>& query,
+                      const std::vector<uint32_t>& sparse_indices,
+                      const std::vector<float>& sparse_values,
+                      size_t k,
+                      const nlohmann::json& filter_array,
+                      bool include_vectors,
+                      size_t ef) {
         try {
             auto& entry = getIndexEntry(index_id);
             entry.searchCount += k;
@@ -1523,24 +1664,8 @@ public:
             std::future<std::vector<std::pair<ndd::idInt, float>>> sparse_future;
             if(entry.sparse_storage && !sparse_indices.empty()) {
                 sparse_future = std::async(std::launch::async, [&]() {
-                    ndd::SparseVector sparse_query;
-                    // Sort indices and values together
-                    std::vector<std::pair<uint32_t, float>> pairs;
-                    pairs.reserve(sparse_indices.size());
-                    for(size_t i = 0; i < sparse_indices.size(); ++i) {
-                        pairs.emplace_back(sparse_indices[i], sparse_values[i]);
-                    }
-                    std::sort(pairs.begin(), pairs.end(), [](const auto& a, const auto& b) {
-                        return a.first < b.first;
-                    });
-
-                    sparse_query.indices.reserve(pairs.size());
-                    sparse_query.values.reserve(pairs.size());
-                    for(const auto& p : pairs) {
-                        sparse_query.indices.push_back(p.first);
-                        sparse_query.values.push_back(p.second);
-                    }
-
+                    ndd::SparseVector sparse_query =
+                            ndd::SparseVector::fromArrays(sparse_indices, sparse_values);
                     return entry.sparse_storage->search(sparse_query, k);
                 });
             }
@@ -1638,7 +1763,7 @@ public:
                         std::vector<float> float_data =
                                 ndd::quant::get_quantizer_dispatch(quant_level)
                                         .dequantize(vec_bytes.data(), entry.alg->getDimension());
-                        result.vector = {float_data.begin(), float_data.end()};
+                        result.vector = std::move(float_data);
                     }
                 }
 
@@ -1737,7 +1862,7 @@ public:
                                             ndd::quant::get_quantizer_dispatch(quant_level)
                                                     .dequantize(vec_bytes.data(),
                                                                 entry.alg->getDimension());
-                                    result.vector = {float_data.begin(), float_data.end()};
+                                    result.vector = std::move(float_data);
                                 }
                             }
 
@@ -1776,6 +1901,7 @@ public:
             }
             indices_.erase(it);
         }
+        query_cache_.invalidate(index_id);
 
         // Delete metadata
         metadata_manager_->deleteMetadata(index_id);
@@ -0,0 +1,107 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "json/nlohmann_json.hpp"
+#include "lru_cache.hpp"
+#include "msgpack_ndd.hpp"
+#include "settings.hpp"
+
+// Cache of search results keyed by index and query parameters.
+//
+// Every index has a generation number that is part of the cache key. Any modification of an
+// index bumps its generation, which makes all of its older entries unreachable, so a search that
+// raced with a write and stores its result afterwards can never be served to later queries.
+// Unreachable entries are reclaimed by LRU eviction and the TTL.
+//
+// Results are shared immutably, so a cache hit only copies a pointer while holding the lock.
+class QueryCache {
+public:
+    using Results = std::vector<ndd::VectorResult>;
+    using ResultsPtr = std::shared_ptr<const Results>;
+    using Stats = ndd::LRUCache<std::string, ResultsPtr>::Stats;
+
+    QueryCache() :
+        cache_(settings::QUERY_CACHE_MB * MB, std::chrono::seconds(settings::QUERY_CACHE_TTL_SEC)) {
+    }
+
+    bool enabled() const { return cache_.enabled(); }
+
+    std::string makeKey(const std::string& index_id,
+                        const std::vector<float>& query,
+                        const std::vector<uint32_t>& sparse_indices,
+                        const std::vector<float>& sparse_values,
+                        size_t k,
+                        const nlohmann::json& filter_array,
+                        bool include_vectors,
+                        size_t ef) {
+        std::string filter = filter_array.empty() ? std::string() : filter_array.dump();
+        uint64_t generation = getGeneration(index_id);
+
+        std::string key;
+        key.reserve(index_id.size() + 1 + 4 * sizeof(uint64_t) + 1 + query.size() * sizeof(float)
+                    + sparse_indices.size() * sizeof(uint32_t)
+                    + sparse_values.size() * sizeof(float) + filter.size());
+        key.append(index_id);
+        key.push_back('\0');
+        appendRaw(key, generation);
+        appendRaw(key, static_cast<uint64_t>(k));
+        appendRaw(key, static_cast<uint64_t>(ef));
+        key.push_back(include_vectors ? 1 : 0);
+        appendVector(key, query);
+        appendVector(key, sparse_indices);
+        appendVector(key, sparse_values);
+        key.append(filter);
+        return key;
+    }
+
+    ResultsPtr get(const std::string& key) { return cache_.get(key).value_or(nullptr); }
+
+    void put(const std::string& key, const ResultsPtr& results) {
+        size_t weight = key.size() + sizeof(Results);
+        for(const auto& result : *results) {
+            weight += sizeof(ndd::VectorResult) + result.id.size() + result.meta.size()
+                      + result.filter.size() + result.vector.size() * sizeof(float);
+        }
+        cache_.put(key, results, weight);
+    }
+
+    // Stop serving cached results of an index. Must be called after the index has been modified
+    void invalidate(const std::string& index_id) {
+        if(!enabled()) {
+            return;
+        }
+        std::lock_guard<std::mutex> lock(generations_mutex_);
+        generations_[index_id] = ++next_generation_;
+    }
+
+    Stats getStats() const { return cache_.getStats(); }
+
+private:
+    uint64_t getGeneration(const std::string& index_id) {
+        std::lock_guard<std::mutex> lock(generations_mutex_);
+        auto it = generations_.find(index_id);
+        return it == generations_.end() ? 0 : it->second;
+    }
+
+    template <typename T> static void appendRaw(std::string& key, const T& value) {
+        key.append(reinterpret_cast<const char*>(&value), sizeof(T));
+    }
+
+    template <typename T> static void appendVector(std::string& key, const std::vector<T>& vec) {
+        appendRaw(key, static_cast<uint64_t>(vec.size()));
+        key.append(reinterpret_cast<const char*>(vec.data()), vec.size() * sizeof(T));
+    }
+
+    ndd::LRUCache<std::string, ResultsPtr> cache_;
+    // Generations are never reused, even when an index is deleted and created again
+    std::mutex generations_mutex_;
+    std::unordered_map<std::string, uint64_t> generations_;
+    uint64_t next_generation_{0};
+};
@@ -1,6 +1,11 @@
 // System includes
 #include <iostream>
 #include <filesystem>
+#include <string_view>
+#include <algorithm>
+#include <cctype>
+#include <cstring>
+#include <memory>
 
 // ASIO/Crow related
 #include "crow/query_string.h"
@@ -33,6 +38,8 @@
 #include "settings.hpp"
 #include "core/ndd.hpp"
 #include "auth.hpp"
+#include "compression_utils.hpp"
+#include "lru_cache.hpp"
 #include "quant/common.hpp"
 #include "cpu_compat_check/check_avx_compat.hpp"
 #include "cpu_compat_check/check_arm_compat.hpp"
@@ -82,10 +89,48 @@ struct AuthMiddleware : crow::ILocalMiddleware {
 
     void after_handle(crow::request&, crow::response&, context&) {}
 };
-// Helper function to send error messages in JSON format
+// Inflates request bodies sent with Content-Encoding gzip or deflate so handlers always see the
+// raw payload. Unsupported encodings are rejected with 415 so clients can fall back to identity
+struct DecompressionMiddleware : crow::ILocalMiddleware {
+    struct context {};
+
+    void before_handle(crow::request& req, crow::response& res, context&) {
+        // Content-codings are case-insensitive
+        std::string encoding = crow::utility::trim(req.get_header_value("Content-Encoding"));
+        std::transform(encoding.begin(), encoding.end(), encoding.begin(), [](unsigned char c) {
+            return static_cast<char>(std::tolower(c));
+        });
+        if(encoding.empty() || encoding == "identity") {
+            return;
+        }
+
+        if(encoding != "gzip" && encoding != "deflate") {
+            res.code = 415;
+            res.write("Unsupported Content-Encoding: " + encoding);
+            res.end();
+            return;
+        }
+
+        std::string body;
+        std::string error_msg;
+        if(!ndd::CompressionUtils::inflate(
+                   req.body, body, settings::MAX_DECOMPRESSED_BODY_SIZE, error_msg)) {
+            res.code = 400;
+            res.write("Failed to decompress request body: " + error_msg);
+            res.end();
+            return;
+        }
+        req.body = std::move(body);
+    }
+
+    void after_handle(crow::request&, crow::response&, context&) {}
+};
+
+// Helper function to send error messages in JSON format. Passing the wvalue sets the
+// application/json Content-Type, so clients decode the body as UTF-8 instead of sniffing it
 inline crow::response json_error(int code, const std::string& message) {
     crow::json::wvalue err_json({{"error", message}});
-    return crow::response(code, err_json.dump());
+    return crow::response(code, err_json);
 }
 // Special helper function to log and send error messages in JSON format for 500 errors
 inline crow::response
@@ -93,7 +138,257 @@ json_error_500(const std::string& username, const std::string& path, const std::
     LOG_ERROR("500 Error | user: " << username << " | path: " << path << " | message: " << message);
 
     crow::json::wvalue err_json({{"error", message}});
-    return crow::response(500, err_json.dump());
+    return crow::response(500, err_json);
+}
+
+// Build the full "username/index_name" index id with a single allocation
+inline std::string make_index_id(const std::string& username, std::string_view index_name) {
+    std::string index_id;
+    index_id.reserve(username.size() + 1 + index_name.size());
+    index_id.append(username);
+    index_id.push_back('/');
+    index_id.append(index_name);
+    return index_id;
+}
+
+// Shared empty filter used by searches without a filter
+std::shared_ptr<const nlohmann::json> empty_filter() {
+    static const auto empty = std::make_shared<const nlohmann::json>(nlohmann::json::array());
+    return empty;
+}
+
+// Parameters of a single search query
+struct SearchRequest {
+    std::vector<float> query;
+    std::vector<uint32_t> sparse_indices;
+    std::vector<float> sparse_values;
+    size_t k = 0;
+    size_t ef = 0;
+    bool include_vectors = false;
+    // Parsed filters are shared with the filter cache, so they are never modified
+    std::shared_ptr<const nlohmann::json> filter_array = empty_filter();
+};
+
+// Parse the filter of a search query. Filters are sent as a JSON string in every body format.
+// Clients tend to send the same few filters over and over, so parsed filters are cached by their
+// raw string
+std::optional<crow::response> parse_search_filter(const std::string& filter,
+                                                  SearchRequest& search) {
+    static ndd::LRUCache<std::string, std::shared_ptr<const nlohmann::json>> filter_cache(
+            settings::FILTER_CACHE_SIZE);
+
+    if(auto cached = filter_cache.get(filter)) {
+        search.filter_array = std::move(*cached);
+        return std::nullopt;
+    }
+
+    try {
+        auto raw_filter = nlohmann::json::parse(filter);
+        // Expect new array-based filter format
+        if(!raw_filter.is_array()) {
+            return json_error(400,
+                              "Filter must be an array. Please use format: "
+                              "[{\"field\":{\"$op\":value}}]");
+        }
+        search.filter_array = std::make_shared<const nlohmann::json>(std::move(raw_filter));
+        if(filter.size() <= settings::MAX_CACHED_FILTER_SIZE) {
+            filter_cache.put(filter, search.filter_array);
+        }
+    } catch(const std::exception& e) {
+        return json_error(400, std::string("Invalid filter JSON: ") + e.what());
+    }
+    return std::nullopt;
+}
+
+// Checks shared by all body formats once a search query has been decoded
+std::optional<crow::response> validate_search_request(const SearchRequest& search) {
+    if(search.sparse_indices.size() != search.sparse_values.size()) {
+        return json_error(400, "Mismatch between sparse_indices and sparse_values size");
+    }
+    if(search.k < settings::MIN_K || search.k > settings::MAX_K) {
+        LOG_ERROR("Invalid k: " << search.k);
+        return json_error(400,
+                          "k must be between " + std::to_string(settings::MIN_K) + " and "
+                                  + std::to_string(settings::MAX_K));
+    }
+    return std::nullopt;
+}
+
+// Parse and validate a search query. Returns an error response if the query is invalid
+std::optional<crow::response> parse_search_request(const crow::json::rvalue& body,
+                                                   SearchRequest& search) {
+    if(!body.has("k")) {
+        return json_error(400, "Missing required parameters: k");
+    }
+
+    if(!body.has("vector") && !body.has("sparse_indices")) {
+        return json_error(400, "Missing query vector (dense or sparse)");
+    }
+
+    if(body.has("vector")) {
+        search.query.reserve(body["vector"].size());
+        for(const auto& elem : body["vector"]) {
+            search.query.push_back((float)elem.d());
+        }
+    }
+
+    if(body.has("sparse_indices")) {
+        search.sparse_indices.reserve(body["sparse_indices"].size());
+        for(const auto& elem : body["sparse_indices"]) {
+            search.sparse_indices.push_back((uint32_t)elem.i());
+        }
+    }
+
+    if(body.has("sparse_values")) {
+        search.sparse_values.reserve(body["sparse_values"].size());
+        for(const auto& elem : body["sparse_values"]) {
+            search.sparse_values.push_back((float)elem.d());
+        }
+    }
+
+    search.k = (size_t)body["k"].i();
+    search.ef = body.has("ef") ? (size_t)body["ef"].i() : 0;
+    search.include_vectors = body.has("include_vectors") ? body["include_vectors"].b() : false;
+
+    if(body.has("filter")) {
+        if(auto error = parse_search_filter(body["filter"].s(), search)) {
+            return error;
+        }
+    }
+    return validate_search_request(search);
+}
+
+// Parse a search query sent as a MessagePack map with the same keys as the JSON body. The dense
+// vector may also be sent as a bin of raw float32 values to skip per-element decoding
+std::optional<crow::response> parse_search_request(const msgpack::object& body,
+                                                   SearchRequest& search) {
+    if(body.type != msgpack::type::MAP) {
+        return json_error(400, "Search query must be a map");
+    }
+
+    bool has_k = false;
+    bool has_query = false;
+    try {
+        for(uint32_t i = 0; i < body.via.map.size; i++) {
+            const auto& entry = body.via.map.ptr[i];
+            if(entry.key.type != msgpack::type::STR) {
+                continue;
+            }
+            std::string_view key(entry.key.via.str.ptr, entry.key.via.str.size);
+            const auto& value = entry.val;
+
+            if(key == "k") {
+                search.k = value.as<size_t>();
+                has_k = true;
+            } else if(key == "vector") {
+                if(value.type == msgpack::type::BIN) {
+                    if(value.via.bin.size % sizeof(float) != 0) {
+                        return json_error(400, "Binary vector size must be a multiple of 4 bytes");
+                    }
+                    search.query.resize(value.via.bin.size / sizeof(float));
+                    std::memcpy(search.query.data(), value.via.bin.ptr, value.via.bin.size);
+                } else {
+                    value.convert(search.query);
+                }
+                has_query = true;
+            } else if(key == "sparse_indices") {
+                value.convert(search.sparse_indices);
+                has_query = true;
+            } else if(key == "sparse_values") {
+                value.convert(search.sparse_values);
+            } else if(key == "ef") {
+                search.ef = value.as<size_t>();
+            } else if(key == "include_vectors") {
+                search.include_vectors = value.as<bool>();
+            } else if(key == "filter") {
+                if(auto error = parse_search_filter(value.as<std::string>(), search)) {
+                    return error;
+                }
+            }
+        }
+    } catch(const msgpack::type_error&) {
+        return json_error(400, "Invalid type for search parameter");
+    }
+
+    if(!has_k) {
+        return json_error(400, "Missing required parameters: k");
+    }
+    if(!has_query) {
+        return json_error(400, "Missing query vector (dense or sparse)");
+    }
+    return validate_search_request(search);
+}
+
+// Check if the request body is MessagePack. Anything else is treated as JSON
+bool is_msgpack_request(const crow::request& req) {
+    return req.get_header_value("Content-Type") == "application/msgpack";
+}
+
+// Parse a batch search body {"queries": [...]} in JSON or MessagePack
+std::optional<crow::response> parse_batch_search_request(const crow::request& req,
+                                                         std::vector<SearchRequest>& searches) {
+    auto check_count = [](size_t count) -> std::optional<crow::response> {
+        if(count == 0 || count > settings::MAX_BATCH_QUERIES) {
+            return json_error(400,
+                              "Number of queries must be between 1 and "
+                                      + std::to_string(settings::MAX_BATCH_QUERIES));
+        }
+        return std::nullopt;
+    };
+
+    if(is_msgpack_request(req)) {
+        try {
+            auto oh = msgpack::unpack(req.body.data(), req.body.size());
+            const auto& body = oh.get();
+
+            const msgpack::object* queries = nullptr;
+            if(body.type == msgpack::type::MAP) {
+                for(uint32_t i = 0; i < body.via.map.size; i++) {
+                    const auto& entry = body.via.map.ptr[i];
+                    if(entry.key.type == msgpack::type::STR
+                       && std::string_view(entry.key.via.str.ptr, entry.key.via.str.size)
+                                  == "queries") {
+                        queries = &entry.val;
+                        break;
+                    }
+                }
+            }
+            if(!queries || queries->type != msgpack::type::ARRAY) {
+                return json_error(400, "Missing required parameter: queries");
+            }
+            if(auto error = check_count(queries->via.array.size)) {
+                return error;
+            }
+
+            searches.resize(queries->via.array.size);
+            for(size_t i = 0; i < searches.size(); i++) {
+                if(auto error = parse_search_request(queries->via.array.ptr[i], searches[i])) {
+                    return error;
+                }
+            }
+        } catch(const msgpack::unpack_error& e) {
+            return json_error(400, std::string("Invalid MessagePack: ") + e.what());
+        }
+        return std::nullopt;
+    }
+
+    auto body = crow::json::load(req.body);
+    if(!body || !body.has("queries") || body["queries"].t() != crow::json::type::List) {
+        return json_error(400, "Missing required parameter: queries");
+    }
+
+    const auto& queries = body["queries"];
+    if(auto error = check_count(queries.size())) {
+        return error;
+    }
+
+    searches.resize(queries.size());
+    for(size_t i = 0; i < queries.size(); i++) {
+        if(auto error = parse_search_request(queries[i], searches[i])) {
+            return error;
+        }
+    }
+    return std::nullopt;
 }
 
 /**
@@ -190,6 +485,7 @@ int main(int argc, char** argv) {
     LOG_DEBUG("DATA_DIR: " << settings::DATA_DIR);
     LOG_DEBUG("NUM_PARALLEL_INSERTS: " << settings::NUM_PARALLEL_INSERTS);
     LOG_DEBUG("NUM_RECOVERY_THREADS: " << settings::NUM_RECOVERY_THREADS);
+    LOG_DEBUG("KEEPALIVE_TIMEOUT_SEC: " << settings::KEEPALIVE_TIMEOUT_SEC);
     LOG_DEBUG("MAX_MEMORY_GB: " << settings::MAX_MEMORY_GB);
     LOG_DEBUG("ENABLE_DEBUG_LOG: " << settings::ENABLE_DEBUG_LOG);
     LOG_DEBUG("AUTH_TOKEN: " << settings::AUTH_TOKEN);
@@ -225,9 +521,14 @@ int main(int argc, char** argv) {
     LOG_INFO("Created auth manager");
     IndexManager index_manager(settings::MAX_ACTIVE_INDICES, data_dir, persistence_config);
     LOG_INFO("Created index manager");
+    // Idempotency keys of recently applied inserts, so client retries are not applied twice
+    // The value is a hash of the request body, so a reused key with a different body is detected
+    ndd::LRUCache<std::string, size_t> idempotency_keys(
+            settings::IDEMPOTENCY_CACHE_SIZE,
+            std::chrono::seconds(settings::IDEMPOTENCY_KEY_TTL_SEC));
 
     // Initialize the app
-    crow::App<AuthMiddleware> app{AuthMiddleware(auth_manager)};
+    crow::App<AuthMiddleware, DecompressionMiddleware> app{AuthMiddleware(auth_manager)};
 
     // ========== GENERAL ==========
     // Health check endpoint (no auth required)
@@ -241,7 +542,7 @@ int main(int argc, char** argv) {
     // ========= USER ENDPOINTS ==========
     // Get user info - returns default user info
     CROW_ROUTE(app, "/api/v1/users/<string>/info")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&auth_manager, &app](const crow::request& req,
                                                          const std::string& target_username) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -260,7 +561,7 @@ int main(int argc, char** argv) {
 
     // Get user type - always returns Admin in open-source mode
     CROW_ROUTE(app, "/api/v1/users/<string>/type")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&auth_manager, &app](const crow::request& req,
                                                          const std::string& target_username) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -280,15 +581,23 @@ int main(int argc, char** argv) {
                 }
             });
 
-    CROW_ROUTE(app, "/api/v1/stats").methods("GET"_method)([](const crow::request& req) {
-        crow::json::wvalue response(
-                {{"version", settings::VERSION}, {"uptime", 0}, {"total_requests", 0}});
-        return crow::response(200, response.dump());
-    });
+    CROW_ROUTE(app, "/api/v1/stats")
+            .methods("GET"_method)([&index_manager](const crow::request& req) {
+                auto cache_stats = index_manager.getQueryCacheStats();
+                crow::json::wvalue response(
+                        {{"version", settings::VERSION}, {"uptime", 0}, {"total_requests", 0}});
+                response["query_cache"] = crow::json::wvalue(
+                        {{"hits", static_cast<int64_t>(cache_stats.hits)},
+                         {"misses", static_cast<int64_t>(cache_stats.misses)},
+                         {"evictions", static_cast<int64_t>(cache_stats.evictions)},
+                         {"entries", static_cast<int64_t>(cache_stats.entries)},
+                         {"bytes", static_cast<int64_t>(cache_stats.weight)}});
+                return crow::response(200, response.dump());
+            });
 
     // Create index
     CROW_ROUTE(app, "/api/v1/index/create")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
 
@@ -304,8 +613,11 @@ int main(int argc, char** argv) {
                     return json_error(400, "Missing required parameters");
                 }
 
-                // Format index_id as username/index_name
-                std::string index_id = ctx.username + "/" + std::string(body["index_name"].s());
+                // Format index_id as username/index_name. The name is viewed in place in the
+                // parsed body, so index_id is the only allocation
+                auto index_name = body["index_name"].s();
+                std::string index_id = make_index_id(
+                        ctx.username, std::string_view(index_name.begin(), index_name.size()));
 
                 // Get checksum (optional, for queryable encryption)
                 int32_t checksum = body.has("checksum") ? body["checksum"].i() : -1;
@@ -395,7 +707,7 @@ int main(int argc, char** argv) {
 
     // Create Backup
     CROW_ROUTE(app, "/api/v1/index/<string>/backup")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req,
                                                            const std::string& index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -406,7 +718,7 @@ int main(int argc, char** argv) {
                 }
 
                 std::string backup_name = body["name"].s();
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
 
                 try {
                     std::pair<bool, std::string> result =
@@ -422,7 +734,7 @@ int main(int argc, char** argv) {
 
     // List Backups
     CROW_ROUTE(app, "/api/v1/backups")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&index_manager, &app](const crow::request& req) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
                 try {
@@ -440,7 +752,7 @@ int main(int argc, char** argv) {
 
     // Restore Backup
     CROW_ROUTE(app, "/api/v1/backups/<string>/restore")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req,
                                                            const std::string& backup_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -466,7 +778,7 @@ int main(int argc, char** argv) {
 
     // Delete Backup
     CROW_ROUTE(app, "/api/v1/backups/<string>")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("DELETE"_method)([&index_manager, &app](const crow::request& req,
                                                              const std::string& backup_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -483,7 +795,7 @@ int main(int argc, char** argv) {
 
     // Download Backup
     CROW_ROUTE(app, "/api/v1/backups/<string>/download")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&index_manager, &app](const crow::request& req,
                                                           const std::string& backup_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
@@ -512,7 +824,7 @@ int main(int argc, char** argv) {
 
     // upload Backup
     CROW_ROUTE(app, "/api/v1/backups/upload")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
                 try {
@@ -590,7 +902,7 @@ int main(int argc, char** argv) {
 
     // List indexes for current user
     CROW_ROUTE(app, "/api/v1/index/list")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&index_manager, &app](const crow::request& req) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
 
@@ -622,128 +934,175 @@ int main(int argc, char** argv) {
 
     // Delete index
     CROW_ROUTE(app, "/api/v1/index/<string>/delete")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
-            .methods("DELETE"_method)(
-                    [&index_manager, &app](const crow::request& req, std::string index_name) {
-                        auto& ctx = app.get_context<AuthMiddleware>(req);
-
-                        // Format full index_id
-                        std::string index_id = ctx.username + "/" + index_name;
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
+            .methods("DELETE"_method)([&index_manager, &idempotency_keys, &app](
+                                              const crow::request& req, std::string index_name) {
+                auto& ctx = app.get_context<AuthMiddleware>(req);
 
-                        if(index_manager.deleteIndex(index_id)) {
-                            return crow::response(200, "Index deleted successfully");
-                        } else {
-                            return json_error(404, "Index not found");
-                        }
-                    });
+                // Format full index_id
+                std::string index_id = make_index_id(ctx.username, index_name);
+
+                if(index_manager.deleteIndex(index_id)) {
+                    // Inserts into a recreated index with the same name must not be
+                    // mistaken for replays of inserts into the deleted one
+                    std::string prefix = index_id + '\0';
+                    idempotency_keys.eraseIf(
+                            [&prefix](const std::string& key) { return key.starts_with(prefix); });
+                    return crow::response(200, "Index deleted successfully");
+                } else {
+                    return json_error(404, "Index not found");
+                }
+            });
 
     // Search
     CROW_ROUTE(app, "/api/v1/index/<string>/search")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req,
                                                            std::string index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
                 // Format full index_id
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
 
-                auto body = crow::json::load(req.body);
-                if(!body || !body.has("k")) {
-                    return json_error(400, "Missing required parameters: k");
-                }
-
-                if(!body.has("vector") && !body.has("sparse_indices")) {
-                    return json_error(400, "Missing query vector (dense or sparse)");
-                }
-
-                std::vector<float> query;
-                if(body.has("vector")) {
-                    for(const auto& elem : body["vector"]) {
-                        query.push_back((float)elem.d());
+                SearchRequest search;
+                if(is_msgpack_request(req)) {
+                    try {
+                        auto oh = msgpack::unpack(req.body.data(), req.body.size());
+                        if(auto error = parse_search_request(oh.get(), search)) {
+                            return std::move(*error);
+                        }
+                    } catch(const msgpack::unpack_error& e) {
+                        return json_error(400, std::string("Invalid MessagePack: ") + e.what());
                     }
-                }
-
-                std::vector<uint32_t> sparse_indices;
-                std::vector<float> sparse_values;
-
-                if(body.has("sparse_indices")) {
-                    for(const auto& elem : body["sparse_indices"]) {
-                        sparse_indices.push_back((uint32_t)elem.i());
+                } else {
+                    auto body = crow::json::load(req.body);
+                    if(!body) {
+                        return json_error(400, "Missing required parameters: k");
+                    }
+                    if(auto error = parse_search_request(body, search)) {
+                        return std::move(*error);
                     }
                 }
-
-                if(body.has("sparse_values")) {
-                    for(const auto& elem : body["sparse_values"]) {
-                        sparse_values.push_back((float)elem.d());
+                LOG_DEBUG("Filter: " << search.filter_array->dump());
+                try {
+                    auto search_response = index_manager.searchKNN(index_id,
+                                                                   search.query,
+                                                                   search.sparse_indices,
+                                                                   search.sparse_values,
+                                                                   search.k,
+                                                                   *search.filter_array,
+                                                                   search.include_vectors,
+                                                                   search.ef);
+                    if(!search_response) {
+                        return json_error(404, "Index not found or search failed");
                     }
+
+                    // Serialize the ResultSet using MessagePack directly into the response body
+                    ndd::StringBuffer buf;
+                    msgpack::pack(buf, *search_response);
+                    crow::response resp(200, std::move(buf.data));
+                    resp.add_header("Content-Type", "application/msgpack");
+                    return resp;
+                } catch(const std::runtime_error& e) {
+                    return json_error(400, e.what());
+                } catch(const std::exception& e) {
+                    LOG_DEBUG("Search failed: " << e.what());
+                    return json_error_500(
+                            ctx.username, req.url, std::string("Search failed: ") + e.what());
                 }
+            });
 
-                if(sparse_indices.size() != sparse_values.size()) {
-                    return json_error(400,
-                                      "Mismatch between sparse_indices and sparse_values size");
+    // Batch search - run several queries against one index in a single request
+    CROW_ROUTE(app, "/api/v1/index/<string>/batch_search")
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
+            .methods("POST"_method)([&index_manager, &app](const crow::request& req,
+                                                           std::string index_name) {
+                auto& ctx = app.get_context<AuthMiddleware>(req);
+                std::string index_id = make_index_id(ctx.username, index_name);
+
+                std::vector<SearchRequest> searches;
+                if(auto error = parse_batch_search_request(req, searches)) {
+                    return std::move(*error);
                 }
 
-                size_t k = (size_t)body["k"].i();
-                if(k < settings::MIN_K || k > settings::MAX_K) {
-                    LOG_ERROR("Invalid k: " << k);
+                // All results of a batch are held in memory until the response is packed
+                size_t total_results = 0;
+                for(const auto& search : searches) {
+                    total_results += search.k;
+                }
+                if(total_results > settings::MAX_BATCH_RESULTS) {
                     return json_error(400,
-                                      "k must be between " + std::to_string(settings::MIN_K)
-                                              + " and " + std::to_string(settings::MAX_K));
+                                      "Sum of k over all queries must not exceed "
+                                              + std::to_string(settings::MAX_BATCH_RESULTS));
                 }
-                size_t ef = body.has("ef") ? (size_t)body["ef"].i() : 0;
-                bool include_vectors =
-                        body.has("include_vectors") ? body["include_vectors"].b() : false;
-                nlohmann::json filter_array = nlohmann::json::array();  // default: empty filter
 
-                if(body.has("filter")) {
-                    try {
-                        auto raw_filter = nlohmann::json::parse(body["filter"].s());
-                        // Expect new array-based filter format
-                        if(!raw_filter.is_array()) {
-                            return json_error(400,
-                                              "Filter must be an array. Please use format: "
-                                              "[{\"field\":{\"$op\":value}}]");
-                        }
-                        filter_array = raw_filter;
-                    } catch(const std::exception& e) {
-                        return json_error(400, std::string("Invalid filter JSON: ") + e.what());
-                    }
-                }
-                LOG_DEBUG("Filter: " << filter_array.dump());
                 try {
-                    auto search_response = index_manager.searchKNN(index_id,
-                                                                   query,
-                                                                   sparse_indices,
-                                                                   sparse_values,
-                                                                   k,
-                                                                   filter_array,
-                                                                   include_vectors,
-                                                                   ef);
-                    if(!search_response) {
-                        return json_error(404, "Index not found or search failed");
+                    // Results are returned in the same order as the queries
+                    std::vector<QueryCache::ResultsPtr> batch_results;
+                    batch_results.reserve(searches.size());
+                    for(const auto& search : searches) {
+                        auto search_response = index_manager.searchKNN(index_id,
+                                                                       search.query,
+                                                                       search.sparse_indices,
+                                                                       search.sparse_values,
+                                                                       search.k,
+                                                                       *search.filter_array,
+                                                                       search.include_vectors,
+                                                                       search.ef);
+                        if(!search_response) {
+                            return json_error(404, "Index not found or search failed");
+                        }
+                        batch_results.push_back(std::move(search_response));
                     }
 
-                    // Serialize the ResultSet using MessagePack
-                    msgpack::sbuffer sbuf;
-                    msgpack::pack(sbuf, search_response.value());
-                    crow::response resp(200, std::string(sbuf.data(), sbuf.size()));
+                    ndd::StringBuffer buf;
+                    msgpack::packer<ndd::StringBuffer> packer(buf);
+                    packer.pack_array(static_cast<uint32_t>(batch_results.size()));
+                    for(const auto& results : batch_results) {
+                        packer.pack(*results);
+                    }
+                    crow::response resp(200, std::move(buf.data));
                     resp.add_header("Content-Type", "application/msgpack");
                     return resp;
                 } catch(const std::runtime_error& e) {
                     return json_error(400, e.what());
                 } catch(const std::exception& e) {
-                    LOG_DEBUG("Search failed: " << e.what());
+                    LOG_DEBUG("Batch search failed: " << e.what());
                     return json_error_500(
-                            ctx.username, req.url, std::string("Search failed: ") + e.what());
+                            ctx.username, req.url, std::string("Batch search failed: ") + e.what());
                 }
             });
 
     //  Insert a list of vectors
     CROW_ROUTE(app, "/api/v1/index/<string>/vector/insert")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
-            .methods("POST"_method)([&index_manager, &app](const crow::request& req,
-                                                           std::string index_name) {
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
+            .methods("POST"_method)([&index_manager, &idempotency_keys, &app](
+                                            const crow::request& req, std::string index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
+
+                // A retried insert whose first attempt already succeeded is acknowledged
+                // without writing the vectors again
+                std::string idempotency_key = req.get_header_value("Idempotency-Key");
+                size_t body_hash = 0;
+                if(!idempotency_key.empty()) {
+                    idempotency_key = index_id + '\0' + idempotency_key;
+                    body_hash = std::hash<std::string>{}(req.body);
+                    if(auto applied_hash = idempotency_keys.get(idempotency_key)) {
+                        if(*applied_hash != body_hash) {
+                            return json_error(422,
+                                              "Idempotency-Key was already used with a different "
+                                              "request body");
+                        }
+                        LOG_DEBUG("Skipping already applied insert for " << index_id);
+                        return crow::response(200);
+                    }
+                }
+                auto insert_response = [&](bool success) {
+                    if(success && !idempotency_key.empty()) {
+                        idempotency_keys.put(idempotency_key, body_hash);
+                    }
+                    return crow::response(success ? 200 : 400);
+                };
 
                 // Verify content type is application/msgpack or application/json
                 auto content_type = req.get_header_value("Content-Type");
@@ -768,18 +1127,21 @@ int main(int argc, char** argv) {
                         }
 
                         if(item.has("vector")) {
+                            vec.vector.reserve(item["vector"].size());
                             for(const auto& v : item["vector"]) {
                                 vec.vector.push_back(static_cast<float>(v.d()));
                             }
                         }
 
                         if(item.has("sparse_indices")) {
+                            vec.sparse_ids.reserve(item["sparse_indices"].size());
                             for(const auto& v : item["sparse_indices"]) {
                                 vec.sparse_ids.push_back(static_cast<uint32_t>(v.i()));
                             }
                         }
 
                         if(item.has("sparse_values")) {
+                            vec.sparse_values.reserve(item["sparse_values"].size());
                             for(const auto& v : item["sparse_values"]) {
                                 vec.sparse_values.push_back(static_cast<float>(v.d()));
                             }
@@ -788,6 +1150,7 @@ int main(int argc, char** argv) {
                     };
 
                     if(body.t() == crow::json::type::List) {
+                        vectors.reserve(body.size());
                         for(const auto& item : body) {
                             vectors.push_back(parse_obj(item));
                         }
@@ -796,8 +1159,8 @@ int main(int argc, char** argv) {
                     }
 
                     try {
-                        bool success = index_manager.addVectors(index_id, vectors);
-                        return crow::response(success ? 200 : 400);
+                        bool success = index_manager.addVectors(index_id, std::move(vectors));
+                        return insert_response(success);
                     } catch(const std::runtime_error& e) {
                         return json_error(400, e.what());
                     } catch(const std::exception& e) {
@@ -809,19 +1172,26 @@ int main(int argc, char** argv) {
                         auto oh = msgpack::unpack(req.body.data(), req.body.size());
                         auto obj = oh.get();
 
+                        // Try HybridVectorObject first. Only decoding errors fall back to
+                        // VectorObject, so a failed insert is never retried in the other format
+                        std::optional<std::vector<ndd::HybridVectorObject>> hybrid_vectors;
                         try {
-                            // Try HybridVectorObject first
-                            auto vectors = obj.as<std::vector<ndd::HybridVectorObject>>();
-                            LOG_DEBUG("Batch size (Hybrid): " << vectors.size());
-                            bool success = index_manager.addVectors(index_id, vectors);
-                            return crow::response(success ? 200 : 400);
-                        } catch(...) {
-                            // Fallback to VectorObject
-                            auto vectors = obj.as<std::vector<ndd::VectorObject>>();
-                            LOG_DEBUG("Batch size (Dense): " << vectors.size());
-                            bool success = index_manager.addVectors(index_id, vectors);
-                            return crow::response(success ? 200 : 400);
+                            hybrid_vectors = obj.as<std::vector<ndd::HybridVectorObject>>();
+                        } catch(const msgpack::type_error&) {
+                        }
+
+                        if(hybrid_vectors) {
+                            LOG_DEBUG("Batch size (Hybrid): " << hybrid_vectors->size());
+                            bool success =
+                                    index_manager.addVectors(index_id, std::move(*hybrid_vectors));
+                            return insert_response(success);
                         }
+
+                        // Fallback to VectorObject
+                        auto vectors = obj.as<std::vector<ndd::VectorObject>>();
+                        LOG_DEBUG("Batch size (Dense): " << vectors.size());
+                        bool success = index_manager.addVectors(index_id, std::move(vectors));
+                        return insert_response(success);
                     } catch(const std::runtime_error& e) {
                         return json_error(400, e.what());
                     } catch(const std::exception& e) {
@@ -836,11 +1206,11 @@ int main(int argc, char** argv) {
 
     // Get a single vector
     CROW_ROUTE(app, "/api/v1/index/<string>/vector/get")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)(
                     [&index_manager, &app](const crow::request& req, std::string index_name) {
                         auto& ctx = app.get_context<AuthMiddleware>(req);
-                        std::string index_id = ctx.username + "/" + index_name;
+                        std::string index_id = make_index_id(ctx.username, index_name);
 
                         // Read vector ID from JSON input (still using JSON for ID here)
                         auto body = crow::json::load(req.body);
@@ -853,11 +1223,10 @@ int main(int argc, char** argv) {
                             if(!vector) {
                                 return json_error(404, "Vector with the given ID does not exist");
                             }
-                            // Serialize vector as MsgPack
-                            msgpack::sbuffer sbuf;
-                            msgpack::pack(sbuf, vector.value());
-                            // Return as MessagePack
-                            crow::response resp(200, std::string(sbuf.data(), sbuf.size()));
+                            // Serialize vector as MsgPack directly into the response body
+                            ndd::StringBuffer buf;
+                            msgpack::pack(buf, vector.value());
+                            crow::response resp(200, std::move(buf.data));
                             resp.add_header("Content-Type", "application/msgpack");
                             return resp;
                         } catch(const std::exception& e) {
@@ -870,12 +1239,12 @@ int main(int argc, char** argv) {
 
     // Delete a vector
     CROW_ROUTE(app, "/api/v1/index/<string>/vector/<string>/delete")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("DELETE"_method)([&index_manager, &app](const crow::request& req,
                                                              std::string index_name,
                                                              std::string vector_id) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
 
                 LOG_DEBUG("Deleting vector " << vector_id << " from index " << index_id);
 
@@ -895,13 +1264,13 @@ int main(int argc, char** argv) {
                 }
             });
 
-    // Delete vectors by filter
+    // Delete vectors by filter or by a list of IDs
     CROW_ROUTE(app, "/api/v1/index/<string>/vectors/delete")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("DELETE"_method)([&index_manager, &app](const crow::request& req,
                                                              std::string index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
 
                 nlohmann::json body;
                 try {
@@ -909,8 +1278,36 @@ int main(int argc, char** argv) {
                 } catch(const std::exception& e) {
                     return json_error(400, "Invalid JSON body");
                 }
+                if(body.contains("ids")) {
+                    const auto& ids = body["ids"];
+                    if(!ids.is_array()) {
+                        return json_error(400, "ids must be an array");
+                    }
+                    std::vector<std::string> str_ids;
+                    str_ids.reserve(ids.size());
+                    for(const auto& id : ids) {
+                        if(id.is_string()) {
+                            str_ids.push_back(id.get<std::string>());
+                        } else if(id.is_number_integer()) {
+                            str_ids.push_back(std::to_string(id.get<int64_t>()));
+                        } else {
+                            return json_error(400, "ids must be strings or integers");
+                        }
+                    }
+                    try {
+                        size_t deleted_count = index_manager.deleteVectors(index_id, str_ids);
+                        return crow::response(200,
+                                              std::to_string(deleted_count) + " vectors deleted");
+                    } catch(const std::runtime_error& e) {
+                        return json_error(400, e.what());
+                    } catch(const std::exception& e) {
+                        return json_error_500(ctx.username,
+                                              req.url,
+                                              std::string("Failed to delete vectors: ") + e.what());
+                    }
+                }
                 if(!body.contains("filter")) {
-                    return json_error(400, "Invalid request body - missing filter");
+                    return json_error(400, "Invalid request body - missing filter or ids");
                 }
                 try {
                     nlohmann::json filter_array = body["filter"];
@@ -935,11 +1332,11 @@ int main(int argc, char** argv) {
 
     // Update filters for vectors
     CROW_ROUTE(app, "/api/v1/index/<string>/filters/update")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("POST"_method)([&index_manager, &app](const crow::request& req,
                                                            std::string index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
 
                 nlohmann::json body;
                 try {
@@ -977,11 +1374,11 @@ int main(int argc, char** argv) {
             });
 
     CROW_ROUTE(app, "/api/v1/index/<string>/info")
-            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .CROW_MIDDLEWARES(app, AuthMiddleware, DecompressionMiddleware)
             .methods("GET"_method)([&index_manager, &app](const crow::request& req,
                                                           std::string index_name) {
                 auto& ctx = app.get_context<AuthMiddleware>(req);
-                std::string index_id = ctx.username + "/" + index_name;
+                std::string index_id = make_index_id(ctx.username, index_name);
                 try {
                     auto info = index_manager.getIndexInfo(index_id);
                     if(!info) {
@@ -1085,6 +1482,9 @@ int main(int argc, char** argv) {
 
     unsigned int num_cores = std::thread::hardware_concurrency();
     LOG_INFO("Number of processor cores: " << num_cores);
+
+    // Keep idle client connections open long enough for pooled clients to reuse them
+    app.timeout(static_cast<std::uint8_t>(settings::KEEPALIVE_TIMEOUT_SEC));
     if(settings::NUM_SERVER_THREADS == 0) {
         // Run on max possible threads
         LOG_INFO("Using all available threads");
@@ -3,6 +3,8 @@
 #include <vector>
 #include <cstring>
 #include <stdexcept>
+#include <algorithm>
+#include <numeric>
 #include "mdbx/mdbx.h"
 
 namespace ndd {
@@ -52,6 +54,34 @@ namespace ndd {
             }
         }
 
+        // Build from parallel index/value arrays, sorting by term ID. Clients usually send indices
+        // already sorted, in which case both arrays are copied as-is without building pairs.
+        // Both arrays must have the same size; callers validate this on the request
+        static SparseVector fromArrays(const std::vector<uint32_t>& indices,
+                                       const std::vector<float>& values) {
+            SparseVector vec;
+            if(std::is_sorted(indices.begin(), indices.end())) {
+                vec.indices = indices;
+                vec.values = values;
+                return vec;
+            }
+
+            // Sort a permutation and gather both arrays through it
+            std::vector<uint32_t> order(indices.size());
+            std::iota(order.begin(), order.end(), 0);
+            std::sort(order.begin(), order.end(), [&indices](uint32_t a, uint32_t b) {
+                return indices[a] < indices[b];
+            });
+
+            vec.indices.reserve(order.size());
+            vec.values.reserve(order.size());
+            for(uint32_t pos : order) {
+                vec.indices.push_back(indices[pos]);
+                vec.values.push_back(values[pos]);
+            }
+            return vec;
+        }
+
         // Convenience constructors
         explicit SparseVector(const MDBX_val& mdb_val) :
             SparseVector(static_cast<const uint8_t*>(mdb_val.iov_base), mdb_val.iov_len) {}
@@ -0,0 +1,63 @@
+#pragma once
+#include <algorithm>
+#include <string>
+#include <zlib.h>
+
+namespace ndd {
+
+    class CompressionUtils {
+    public:
+        // Inflate gzip or zlib (HTTP "deflate") data. The format is detected from the header.
+        // Fails if the output would grow beyond max_size to guard against decompression bombs
+        static bool inflate(const std::string& input,
+                            std::string& output,
+                            size_t max_size,
+                            std::string& error_msg) {
+            z_stream stream{};
+            // MAX_WBITS | 32 enables automatic gzip/zlib header detection
+            if(inflateInit2(&stream, MAX_WBITS | 32) != Z_OK) {
+                error_msg = "Failed to initialize zlib";
+                return false;
+            }
+
+            stream.next_in = reinterpret_cast<Bytef*>(const_cast<char*>(input.data()));
+            stream.avail_in = static_cast<uInt>(input.size());
+
+            output.clear();
+            // Float-heavy payloads typically compress 3-5x
+            output.reserve(std::min(input.size() * 4, max_size));
+
+            char buffer[64 * 1024];
+            int ret = Z_OK;
+            while(ret != Z_STREAM_END) {
+                stream.next_out = reinterpret_cast<Bytef*>(buffer);
+                stream.avail_out = sizeof(buffer);
+
+                ret = ::inflate(&stream, Z_NO_FLUSH);
+                if(ret == Z_BUF_ERROR) {
+                    // No progress possible: the input ended before the end of the stream
+                    error_msg = "Truncated compressed data";
+                    inflateEnd(&stream);
+                    return false;
+                }
+                if(ret != Z_OK && ret != Z_STREAM_END) {
+                    error_msg = stream.msg ? stream.msg : "Invalid compressed data";
+                    inflateEnd(&stream);
+                    return false;
+                }
+
+                size_t produced = sizeof(buffer) - stream.avail_out;
+                if(output.size() + produced > max_size) {
+                    error_msg = "Decompressed body exceeds " + std::to_string(max_size) + " bytes";
+                    inflateEnd(&stream);
+                    return false;
+                }
+                output.append(buffer, produced);
+            }
+
+            inflateEnd(&stream);
+            return true;
+        }
+    };
+
+}  // namespace ndd
@@ -0,0 +1,129 @@
+#pragma once
+
+#include <chrono>
+#include <cstddef>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <optional>
+#include <unordered_map>
+
+namespace ndd {
+
+    // Thread-safe LRU cache with an optional time-to-live.
+    // Capacity is measured in caller supplied weights (1 per entry by default) so the same cache
+    // can be bounded either by entry count or by approximate memory usage.
+    // A capacity of 0 disables the cache: get() always misses and put() is a no-op.
+    template <typename Key, typename Value, typename Hash = std::hash<Key>> class LRUCache {
+    public:
+        struct Stats {
+            size_t hits;
+            size_t misses;
+            size_t evictions;
+            size_t entries;
+            size_t weight;
+        };
+
+        explicit LRUCache(size_t capacity,
+                          std::chrono::seconds ttl = std::chrono::seconds::zero()) :
+            capacity_(capacity),
+            ttl_(ttl) {}
+
+        LRUCache(const LRUCache&) = delete;
+        LRUCache& operator=(const LRUCache&) = delete;
+
+        bool enabled() const { return capacity_ > 0; }
+
+        std::optional<Value> get(const Key& key) {
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto it = index_.find(key);
+            if(it == index_.end()) {
+                misses_++;
+                return std::nullopt;
+            }
+            if(isExpired(*it->second)) {
+                removeNode(it->second);
+                misses_++;
+                return std::nullopt;
+            }
+            // Move to the front of the LRU list
+            items_.splice(items_.begin(), items_, it->second);
+            hits_++;
+            return it->second->value;
+        }
+
+        void put(const Key& key, Value value, size_t weight = 1) {
+            if(!enabled() || weight > capacity_) {
+                return;
+            }
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto it = index_.find(key);
+            if(it != index_.end()) {
+                removeNode(it->second);
+            }
+
+            auto expires_at = ttl_.count() > 0 ? Clock::now() + ttl_ : Clock::time_point::max();
+            items_.push_front(Node{key, std::move(value), weight, expires_at});
+            index_.emplace(key, items_.begin());
+            weight_ += weight;
+
+            // Evict least recently used entries until we fit
+            while(weight_ > capacity_ && !items_.empty()) {
+                removeNode(std::prev(items_.end()));
+                evictions_++;
+            }
+        }
+
+        // Remove all entries for which pred(key) returns true. Returns the number of removed
+        // entries
+        template <typename Pred> size_t eraseIf(Pred pred) {
+            std::lock_guard<std::mutex> lock(mutex_);
+            size_t removed = 0;
+            for(auto it = items_.begin(); it != items_.end();) {
+                auto next = std::next(it);
+                if(pred(it->key)) {
+                    removeNode(it);
+                    removed++;
+                }
+                it = next;
+            }
+            return removed;
+        }
+
+        Stats getStats() const {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return Stats{hits_, misses_, evictions_, items_.size(), weight_};
+        }
+
+    private:
+        using Clock = std::chrono::steady_clock;
+
+        struct Node {
+            Key key;
+            Value value;
+            size_t weight;
+            Clock::time_point expires_at;
+        };
+        using NodeList = std::list<Node>;
+
+        bool isExpired(const Node& node) const { return Clock::now() >= node.expires_at; }
+
+        // Caller must hold mutex_
+        void removeNode(typename NodeList::iterator node) {
+            weight_ -= node->weight;
+            index_.erase(node->key);
+            items_.erase(node);
+        }
+
+        const size_t capacity_;
+        const std::chrono::seconds ttl_;
+        mutable std::mutex mutex_;
+        NodeList items_;  // Most recently used entry at the front
+        std::unordered_map<Key, typename NodeList::iterator, Hash> index_;
+        size_t weight_{0};
+        size_t hits_{0};
+        size_t misses_{0};
+        size_t evictions_{0};
+    };
+
+}  // namespace ndd
@@ -102,4 +102,12 @@ namespace ndd {
         MSGPACK_DEFINE(dense, sparse)
     };
 
+    // MsgPack output stream that packs straight into a std::string. The packed bytes can then be
+    // moved into an HTTP response body instead of being copied out of a msgpack::sbuffer
+    struct StringBuffer {
+        std::string data;
+
+        void write(const char* buf, size_t len) { data.append(buf, len); }
+    };
+
 }  // namespace ndd
\ No newline at end of file
@@ -32,12 +32,25 @@ namespace settings {
     constexpr size_t DEFAULT_EF_SEARCH = 128;
     constexpr size_t MIN_K = 1;
     constexpr size_t MAX_K = 4096;
+    constexpr size_t MAX_BATCH_QUERIES = 1024;       // Max queries in a single batch search request
+    constexpr size_t MAX_BATCH_RESULTS = 64 * 1024;  // Max sum of k over a batch search request
+    constexpr size_t FILTER_CACHE_SIZE = 256;  // Number of parsed search filters kept in memory
+    constexpr size_t MAX_CACHED_FILTER_SIZE = 4 * KB;  // Larger filters are parsed every time
+    // Upper bound for gzip/deflate request bodies after decompression
+    constexpr size_t MAX_DECOMPRESSED_BODY_SIZE = 1 * GB;
     constexpr size_t RANDOM_SEED = 100;
     constexpr size_t SAVE_EVERY_N_UPDATES = 10'000;
     constexpr size_t RECOVERY_BATCH_SIZE = 20'000;
+    // Insert requests larger than this are added to the index in chunks of this size
+    constexpr size_t INSERT_CHUNK_SIZE = 10'000;
+    // Idempotency-Key values of successful inserts are remembered to deduplicate client retries
+    constexpr size_t IDEMPOTENCY_CACHE_SIZE = 10'000;
+    constexpr size_t IDEMPOTENCY_KEY_TTL_SEC = 600;
     constexpr size_t SAVE_EVERY_N_MINUTES = 30;
-    // Number of threads for http server - 0 means it will default to hardware concurrency
-    constexpr size_t NUM_SERVER_THREADS = 0;
+    // Idle keep-alive timeout for client connections in seconds. Crow defaults to 5s which makes
+    // pooled clients reconnect (and redo the TLS handshake) between bursts of requests
+    constexpr size_t DEFAULT_KEEPALIVE_TIMEOUT_SEC = 60;
+    constexpr size_t MAX_KEEPALIVE_TIMEOUT_SEC = 255;  // Crow stores the timeout as uint8_t
     // Number of save mutexes for parallel saves
     constexpr size_t NUM_INDEX_SAVE_MUTEXES = 16;
 
@@ -82,7 +95,11 @@ namespace settings {
     //DEFAULT VALUES
     constexpr size_t DEFAULT_NUM_PARALLEL_INSERTS = 4;
     constexpr size_t DEFAULT_NUM_RECOVERY_THREADS = 16;
+    // Number of threads for http server - 0 means it will default to hardware concurrency
+    constexpr size_t DEFAULT_NUM_SERVER_THREADS = 0;
     constexpr size_t DEFAULT_MAX_MEMORY_GB = 24;
+    constexpr size_t DEFAULT_QUERY_CACHE_MB = 0;
+    constexpr size_t DEFAULT_QUERY_CACHE_TTL_SEC = 300;
     constexpr bool DEFAULT_ENABLE_DEBUG_LOG = true;
     const std::string DEFAULT_AUTH_TOKEN = "";
     inline static std::string DEFAULT_USERNAME = "endee";
@@ -144,10 +161,20 @@ namespace settings {
         const char* env = std::getenv("NDD_NUM_PARALLEL_INSERTS");
         return env ? std::stoull(env) : DEFAULT_NUM_PARALLEL_INSERTS;
     }();
+    inline static size_t KEEPALIVE_TIMEOUT_SEC = [] {
+        const char* env = std::getenv("NDD_KEEPALIVE_TIMEOUT");
+        size_t timeout = env ? std::stoull(env) : DEFAULT_KEEPALIVE_TIMEOUT_SEC;
+        return std::clamp<size_t>(timeout, 1, MAX_KEEPALIVE_TIMEOUT_SEC);
+    }();
     inline static size_t NUM_RECOVERY_THREADS = [] {
         const char* env = std::getenv("NDD_NUM_RECOVERY_THREADS");
         return env ? std::stoull(env) : DEFAULT_NUM_RECOVERY_THREADS;
     }();
+    // Concurrent requests are served in parallel up to this many worker threads
+    inline static size_t NUM_SERVER_THREADS = [] {
+        const char* env = std::getenv("NDD_NUM_THREADS");
+        return env ? std::stoull(env) : DEFAULT_NUM_SERVER_THREADS;
+    }();
     // TODO - Check if we can set this dynamically based on system memory
     // Max memory for HNSW index. It will evict the oldest index if it exceeds this limit
     inline static size_t MAX_MEMORY_GB = [] {
@@ -155,6 +182,19 @@ namespace settings {
         return env ? std::stoull(env) : DEFAULT_MAX_MEMORY_GB;  // 24 GB by default
     }();
 
+    // Memory budget for cached search results. 0 (the default) disables the query cache, so only
+    // deployments that repeat queries pay for key building and result bookkeeping
+    inline static size_t QUERY_CACHE_MB = [] {
+        const char* env = std::getenv("NDD_QUERY_CACHE_MB");
+        return env ? std::stoull(env) : DEFAULT_QUERY_CACHE_MB;
+    }();
+    // Cached search results expire after this many seconds. 0 means they are only dropped by LRU
+    // eviction. Results of a modified index are never served regardless of the TTL
+    inline static size_t QUERY_CACHE_TTL_SEC = [] {
+        const char* env = std::getenv("NDD_QUERY_CACHE_TTL");
+        return env ? std::stoull(env) : DEFAULT_QUERY_CACHE_TTL_SEC;
+    }();
+
     inline static bool ENABLE_DEBUG_LOG = [] {
         const char* env = std::getenv("NDD_DEBUG_LOG");
         return env ? (std::string(env) == "1" || std::string(env) == "true")
@@ -184,7 +224,11 @@ namespace settings {
         oss << "MAX_ELEMENTS_INCREMENT_TRIGGER: " << MAX_ELEMENTS_INCREMENT_TRIGGER << "\n";
         oss << "NUM_PARALLEL_INSERTS: " << NUM_PARALLEL_INSERTS << "\n";
         oss << "NUM_RECOVERY_THREADS: " << NUM_RECOVERY_THREADS << "\n";
+        oss << "NUM_SERVER_THREADS: " << NUM_SERVER_THREADS << "\n";
+        oss << "KEEPALIVE_TIMEOUT_SEC: " << KEEPALIVE_TIMEOUT_SEC << "\n";
         oss << "MAX_MEMORY_GB: " << MAX_MEMORY_GB << "\n";
+        oss << "QUERY_CACHE_MB: " << QUERY_CACHE_MB << "\n";
+        oss << "QUERY_CACHE_TTL_SEC: " << QUERY_CACHE_TTL_SEC << "\n";
         oss << "ENABLE_DEBUG_LOG: " << (ENABLE_DEBUG_LOG ? "true" : "false") << "\n";
         oss << "AUTH_ENABLED: " << (AUTH_ENABLED ? "true" : "false") << "\n";
         oss << "DEFAULT_USERNAME: " << DEFAULT_USERNAME << "\n";